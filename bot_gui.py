@@ -13,20 +13,24 @@
 # No external dependencies. Pure tkinter + ttk.
 
 import os
+import re
 import sys
 import json
+import codecs
 import queue
 import threading
+import functools
+import collections
 import subprocess
+import ctypes
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from tkinter import font as tkfont
 
-import pyautogui  # for global hotkeys to the bots
-pyautogui.FAILSAFE = False
-
 APP_TITLE = "BlueBot Studio"
 PREFS_FILE = ".bluebot_gui.json"
+LOG_FLUSH_MAX = 200  # lines written per drain; the rest goes to the next idle
+READ_CHUNK = 1 << 16  # bytes per os.read() of bot stdout
 
 # --- Bot script paths (adjust if your file names differ) ---
 BOT_SCRIPTS = {
@@ -35,6 +39,20 @@ BOT_SCRIPTS = {
     "Towering": "towering_bot.py",
 }
 
+# --- Global hotkeys to the bots (Windows virtual-key codes) ---
+HOTKEY_VK = {"f8": 0x77, "f9": 0x78, "f10": 0x79}
+KEYEVENTF_KEYUP = 0x0002
+
+# --- Log tag heuristics: one case-insensitive pass per line ---
+_TAG_RE = re.compile(
+    r"(\[error\]|error:|kanamia|tina|towering|\[probe\]|\[bot\])", re.IGNORECASE)
+_TAG_MAP = {
+    "[error]": "err", "error:": "err",
+    "kanamia": "kanamia", "tina": "tina", "towering": "towering",
+    "[probe]": "probe", "[bot]": "bot",
+}
+_TAG_ORDER = ("err", "kanamia", "tina", "towering", "probe", "bot")
+
 # --- Default preferences (loaded/saved to .bluebot_gui.json) ---
 DEFAULT_PREFS = {
     "bot": "Kanamia",
@@ -43,16 +61,27 @@ DEFAULT_PREFS = {
     "window_title": "",
     "wrap_logs": False,
     "accent_color": "#7C5CFF",  # soft violet
+    "max_log_lines": 5000,      # per log pane; oldest lines are trimmed
 }
 
 # -------------- Utilities --------------
 
 
+# Signature of what's on disk, so unchanged prefs are never rewritten
+_last_prefs_sig: int | None = None
+
+
+def _prefs_sig(prefs: dict) -> int:
+    return hash(json.dumps(prefs, sort_keys=True))
+
+
 def load_prefs() -> dict:
+    global _last_prefs_sig
     if os.path.exists(PREFS_FILE):
         try:
             with open(PREFS_FILE, "r", encoding="utf-8") as f:
                 data = json.load(f)
+                _last_prefs_sig = _prefs_sig(data)
                 return {**DEFAULT_PREFS, **data}
         except Exception:
             pass
@@ -60,21 +89,75 @@ def load_prefs() -> dict:
 
 
 def save_prefs(prefs: dict):
+    global _last_prefs_sig
+    sig = _prefs_sig(prefs)
+    if sig == _last_prefs_sig:
+        return
+    # write to a temp file and swap it in, so a crash never leaves half a file
+    tmp = PREFS_FILE + ".tmp"
     try:
-        with open(PREFS_FILE, "w", encoding="utf-8") as f:
+        with open(tmp, "w", encoding="utf-8") as f:
             json.dump(prefs, f, indent=2)
+        os.replace(tmp, PREFS_FILE)
+        _last_prefs_sig = sig
     except Exception:
         pass
 
 
+def guess_tags(msg: str) -> tuple:
+    # runs on the reader thread, so the UI thread only inserts
+    found = {_TAG_MAP[m.group(1).lower()] for m in _TAG_RE.finditer(msg)}
+    if not found:
+        return ("gray",)
+    # stable order so identical lines merge in _drain_queue
+    return tuple(t for t in _TAG_ORDER if t in found)
+
+
+def send_hotkey(key_name: str):
+    # Windows: straight to user32. Elsewhere pyautogui, imported only when needed.
+    vk = HOTKEY_VK.get(key_name.lower())
+    if sys.platform == "win32" and vk is not None:
+        user32 = ctypes.windll.user32
+        user32.keybd_event(vk, 0, 0, 0)
+        user32.keybd_event(vk, 0, KEYEVENTF_KEYUP, 0)
+        return
+    import pyautogui
+    pyautogui.FAILSAFE = False
+    pyautogui.keyDown(key_name)
+    pyautogui.keyUp(key_name)
+
+
+# Installed font families per Tk root (the Tk round-trip is slow)
+_FONT_CACHE: dict[int, frozenset[str]] = {}
+
+
 def best_font(*candidates, fallback="Segoe UI"):
     root = tk._get_default_root()
-    available = set(tkfont.families(root))
+    if id(root) not in _FONT_CACHE:
+        _FONT_CACHE[id(root)] = frozenset(tkfont.families(root))
+    return _pick_font(id(root), candidates, fallback)
+
+
+@functools.lru_cache(maxsize=64)
+def _pick_font(root_id: int, candidates: tuple, fallback: str) -> str:
+    available = _FONT_CACHE[root_id]
     for name in candidates:
         if name in available:
             return name
     return fallback
 
+
+def gradient_row(start, end, n: int, shade: float = 1.0) -> list[str]:
+    # n interpolated "#rrggbb" colors; 16.16 fixed-point, one add per channel
+    buf = bytearray(n * 3)
+    for c in range(3):
+        a = int(start[c] * shade) << 16
+        b = int(end[c] * shade) << 16
+        step = int((b - a) / max(1, n - 1))  # truncate, never overshoot
+        buf[c::3] = bytes((a + step * i) >> 16 for i in range(n))
+    hx = buf.hex()
+    return ["#" + hx[i:i+6] for i in range(0, len(hx), 6)]
+
 # -------------- Main GUI --------------
 
 
@@ -87,22 +170,40 @@ class BlueBotGUI(ttk.Frame):
         # State
         self.proc: subprocess.Popen | None = None
         self.stop_reader = threading.Event()
-        self.output_q: "queue.Queue[str]" = queue.Queue()
+        self.output_q: "queue.SimpleQueue[list[tuple[str, tuple]]]" = queue.SimpleQueue()
+        self._drain_pending = threading.Event()
         self.status_state = "idle"  # idle, running, paused
         self.pulse_phase = 0
+        self._pulse_after: str | None = None
+        self._grad_cache: dict[tuple, tk.PhotoImage] = {}
+        self._grad_img: tk.PhotoImage | None = None
 
         # Preferences
         self.prefs = load_prefs()
         self.accent = self.prefs.get(
             "accent_color", DEFAULT_PREFS["accent_color"])
+        try:
+            self.max_log_lines = max(100, int(self.prefs.get("max_log_lines")))
+        except (TypeError, ValueError):
+            self.max_log_lines = DEFAULT_PREFS["max_log_lines"]
+        self._line_counts: dict[str, int] = {}
+        self._scroll_pending: set[str] = set()
+        # (msg, tags, line count) held back for a log pane whose tab isn't
+        # visible, capped at max_log_lines lines (not segments)
+        self._pending_for = {
+            "log": collections.deque(),
+            "preview": collections.deque(),
+        }
+        self._pending_lines = {"log": 0, "preview": 0}
+        self._prefs_after: str | None = None
 
         # Theming & layout
         self._init_theme()
         self._build_header()
         self._build_body()
         self._bind_shortcuts()
-        self._animate_status_pill()
-        self._drain_queue()
+        # reader thread wakes us via <<BotLine>>, no polling
+        self.master.bind("<<BotLine>>", self._drain_queue)
 
         self.master.protocol("WM_DELETE_WINDOW", self.on_close)
         self.master.title(APP_TITLE)
@@ -131,6 +232,9 @@ class BlueBotGUI(ttk.Frame):
         self.warn = "#ffb454"
         self.err = "#e05f65"
         self.accent_hover = self._blend(self.accent, "#FFFFFF", 0.12)
+        # status pill pulse frames (rebuilt with the theme on accent change)
+        self._pulse_colors = [self._blend("#1b2231", self.accent, 0.10 + 0.20 * i / 60)
+                              for i in range(60)]
 
         # Global styles
         style.configure(".", background=self.bg,
@@ -209,27 +313,36 @@ class BlueBotGUI(ttk.Frame):
         self.header_canvas.bind(
             "<Configure>", lambda e: self._paint_header_gradient(header))
 
+    def _reset_gradient_cache(self):
+        # accent changed: every cached header image is stale
+        self._grad_cache.clear()
+
     def _paint_header_gradient(self, canvas: tk.Canvas):
-        canvas.delete("grad")
         w = canvas.winfo_width() or canvas.winfo_reqwidth()
         h = canvas.winfo_height() or 88
 
-        # Smooth diagonal gradient
-        start = self._hex_to_rgb(self.accent)
-        end = self._hex_to_rgb("#0f1116")
-        steps = max(16, w // 16)
-        for i in range(steps):
-            t = i / (steps - 1)
-            r = int(start[0]*(1-t) + end[0]*t)
-            g = int(start[1]*(1-t) + end[1]*t)
-            b = int(start[2]*(1-t) + end[2]*t)
-            x0 = int(i * (w / steps))
-            x1 = int((i+1) * (w / steps))
-            canvas.create_rectangle(
-                x0, 0, x1, h, fill=f"#{r:02x}{g:02x}{b:02x}", width=0, tags="grad")
-        # Overlay soft vignette
-        canvas.create_rectangle(
-            0, 0, w, h, fill="#000000", stipple="gray25", width=0, tags="grad")
+        # One row per 8 px width bucket, zoomed to the canvas height. The row
+        # spans the whole bucket, so at most 7 px of the end color is clipped.
+        key = (-(-w // 8) * 8, h)
+        img = self._grad_cache.get(key)
+        if img is None:
+            hexes = gradient_row(self._hex_to_rgb(self.accent),
+                                 self._hex_to_rgb("#0f1116"), key[0], shade=0.75)
+            row = tk.PhotoImage(master=self.master, width=key[0], height=1)
+            row.put("{" + " ".join(hexes) + "}")
+            img = row.zoom(1, h)
+            if len(self._grad_cache) >= 16:  # drag-resizing visits many widths
+                self._grad_cache.clear()
+            self._grad_cache[key] = img
+        if img is self._grad_img and canvas.find_withtag("grad"):
+            return  # same bucket as last Configure, nothing to redraw
+        self._grad_img = img  # keep a reference, Tk doesn't
+
+        # a single image item, swapped in place rather than recreated
+        if canvas.find_withtag("grad"):
+            canvas.itemconfigure("grad", image=img)
+        else:
+            canvas.create_image(0, 0, anchor="nw", image=img, tags="grad")
 
     # ---------- Body ----------
     def _build_body(self):
@@ -247,10 +360,36 @@ class BlueBotGUI(ttk.Frame):
         self.nb.add(self.tab_settings, text="Settings")
         self.nb.add(self.tab_about, text="About")
 
+        # Control and Logs are the default view; the rest build on first visit
         self._build_control_tab()
         self._build_logs_tab()
-        self._build_settings_tab()
-        self._build_about_tab()
+        self._lazy_tabs = {2: self._build_settings_tab,
+                           3: self._build_about_tab}
+        self._tabs_built: set[int] = set()
+
+        # log pane name -> (widget, index of the tab that shows it)
+        self._log_panes = {"log": (self.log_text, 1),
+                           "preview": (self.preview, 0)}
+        # flipped on <Destroy>, saves a winfo_exists() round-trip per write
+        self._pane_alive = {name: True for name in self._log_panes}
+        for name, (widget, _) in self._log_panes.items():
+            widget.bind("<Destroy>", lambda e, n=name: self._pane_alive.update({n: False}),
+                        add="+")
+        self._visible_tab = self.nb.index(self.nb.select())
+        self.nb.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+
+    def _on_tab_changed(self, event=None):
+        self._visible_tab = self.nb.index(self.nb.select())
+        if self._visible_tab in self._lazy_tabs and self._visible_tab not in self._tabs_built:
+            self._tabs_built.add(self._visible_tab)
+            self._lazy_tabs[self._visible_tab]()
+        # replay what the newly visible pane missed in one batched insert
+        for name, (_, tab) in self._log_panes.items():
+            pending = self._pending_for[name]
+            if tab == self._visible_tab and pending:
+                self._insert_segments(name, [(m, t) for m, t, _ in pending])
+                pending.clear()
+                self._pending_lines[name] = 0
 
     # ---------- Control Tab ----------
     def _build_control_tab(self):
@@ -376,6 +515,8 @@ class BlueBotGUI(ttk.Frame):
         self._style_log_widget(self.log_text)
 
     def _style_log_widget(self, widget: tk.Text):
+        # read-only log: no undo stack to grow with every insert
+        widget.configure(undo=False, autoseparators=False, maxundo=0)
         # Tag colors for nicer logs
         widget.tag_configure("bot", foreground=self.col_text)
         widget.tag_configure("probe", foreground=self.warn)
@@ -454,18 +595,14 @@ class BlueBotGUI(ttk.Frame):
         self._write_log(f"[BlueBot] Launching {script} …\n", tags=("bot",))
         self._set_status("running")
 
-        # Start subprocess with stdout piping (TEXT MODE for line buffering)
+        # Start subprocess with stdout piping (binary; _reader decodes in chunks)
         self.stop_reader.clear()
         try:
             self.proc = subprocess.Popen(
                 cmd,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
-                # line-buffered (works only with text=True)
-                bufsize=1,
-                text=True,                 # <— critical fix
-                encoding="utf-8",
-                errors="replace",
+                bufsize=READ_CHUNK,
                 cwd=os.path.dirname(os.path.abspath(script)) or None,
                 env=env,
             )
@@ -518,8 +655,7 @@ class BlueBotGUI(ttk.Frame):
 
     def _send_key(self, key_name: str):
         try:
-            pyautogui.keyDown(key_name)
-            pyautogui.keyUp(key_name)
+            send_hotkey(key_name)
             self._write_log(
                 f"[BlueBot] Hotkey sent: {key_name.upper()}\n", tags=("bot",))
             if key_name.lower() == "f8":
@@ -533,59 +669,122 @@ class BlueBotGUI(ttk.Frame):
 
     # ---------- Reader / Logs ----------
     def _reader(self, proc: subprocess.Popen):
+        # Raw chunks + incremental UTF-8 decode; one queue put per chunk
         try:
             if proc.stdout is None:
                 return
-            for line in proc.stdout:
-                if self.stop_reader.is_set():
+            fd = proc.stdout.fileno()
+            dec = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            pending = ""
+            while not self.stop_reader.is_set():
+                chunk = os.read(fd, READ_CHUNK)
+                if not chunk:
                     break
-                self.output_q.put(line)
+                pending = (pending + dec.decode(chunk)).replace("\r\n", "\n")
+                *lines, pending = pending.split("\n")
+                if lines:
+                    self.output_q.put([(ln + "\n", guess_tags(ln)) for ln in lines])
+                    self._notify_ui()
+            pending += dec.decode(b"", final=True)
+            if pending and not self.stop_reader.is_set():
+                self.output_q.put([(pending + "\n", guess_tags(pending))])
+                self._notify_ui()
         except Exception as e:
-            self.output_q.put(f"[Error] Reader error: {e}\n")
+            msg = f"[Error] Reader error: {e}\n"
+            self.output_q.put([(msg, guess_tags(msg))])
+            self._notify_ui()
 
-    def _drain_queue(self):
-        drained = False
+    def _notify_ui(self):
+        # Called from the reader thread; only post on empty -> non-empty
+        if self._drain_pending.is_set():
+            return
+        self._drain_pending.set()
+        try:
+            self.master.event_generate("<<BotLine>>", when="tail")
+        except (tk.TclError, RuntimeError):
+            pass  # window is gone
+
+    def _drain_queue(self, event=None):
+        self._drain_pending.clear()
+        # Merge runs of lines with identical tags into one segment each
+        segments: list[tuple[str, tuple]] = []
+        written = 0
         try:
-            while True:
-                msg = self.output_q.get_nowait()
-                drained = True
-                # Tag heuristics
-                tags = self._guess_tags(msg)
-                self._write_log(msg, tags=tags)
+            while written < LOG_FLUSH_MAX:
+                batch = self.output_q.get_nowait()
+                written += len(batch)
+                # lines arrive already tagged by the reader
+                for msg, tags in batch:
+                    if segments and segments[-1][1] == tags:
+                        segments[-1] = (segments[-1][0] + msg, tags)
+                    else:
+                        segments.append((msg, tags))
+            # flood: yield to the UI, continue on the next idle
+            self.master.after_idle(self._drain_queue)
         except queue.Empty:
             pass
-
-        # Keep preview and logs in sync
-        if drained and self.preview.winfo_exists():
-            self.preview.see("end")
-        self.master.after(50, self._drain_queue)
-
-    def _guess_tags(self, msg: str):
-        m = msg.lower()
-        tags = []
-        if "[error]" in m or "error:" in m:
-            tags.append("err")
-        if "kanamia" in m:
-            tags.append("kanamia")
-        if "tina" in m:
-            tags.append("tina")
-        if "towering" in m:
-            tags.append("towering")
-        if "[probe]" in m:
-            tags.append("probe")
-        if "[bot]" in m:
-            tags.append("bot")
-        return tuple(tags) if tags else ("gray",)
+        if segments:
+            self._write_segments(segments)
 
     def _write_log(self, msg: str, tags=("gray",)):
-        # Main log pane
-        if self.log_text.winfo_exists():
-            self.log_text.insert("end", msg, tags)
-            self.log_text.see("end")
-        # Preview pane
-        if self.preview.winfo_exists():
-            self.preview.insert("end", msg, tags)
-            self.preview.see("end")
+        self._write_segments([(msg, tags)])
+
+    def _write_segments(self, segments):
+        # Main log pane + preview pane; the hidden one is replayed on tab change
+        for name, (_, tab) in self._log_panes.items():
+            if tab == self._visible_tab:
+                self._insert_segments(name, segments)
+            else:
+                self._hold_segments(name, segments)
+
+    def _hold_segments(self, name: str, segments):
+        # keep only what the pane would still show after _trim_log; merged
+        # segments hold many lines, so count lines rather than entries
+        pending = self._pending_for[name]
+        lines = self._pending_lines[name]
+        for msg, tags in segments:
+            n = msg.count("\n")
+            pending.append((msg, tags, n))
+            lines += n
+        while lines > self.max_log_lines and len(pending) > 1:
+            lines -= pending.popleft()[2]
+        self._pending_lines[name] = lines
+
+    def _insert_segments(self, name: str, segments):
+        if not self._pane_alive[name]:
+            return
+        widget = self._log_panes[name][0]
+        # One insert per widget: Text.insert takes (chars, tags) pairs
+        args = []
+        added = 0
+        for msg, tags in segments:
+            args += (msg, tags)
+            added += msg.count("\n")
+        # only follow the tail if the user hasn't scrolled up
+        follow = widget.yview()[1] >= 0.999
+        widget.insert("end", *args)
+        self._trim_log(widget, added)
+        if follow:
+            # one see("end") per pane once the current burst is written
+            if not self._scroll_pending:
+                self.master.after_idle(self._do_autoscroll)
+            self._scroll_pending.add(name)
+
+    def _do_autoscroll(self):
+        for name in self._scroll_pending:
+            if self._pane_alive[name]:
+                self._log_panes[name][0].see("end")
+        self._scroll_pending.clear()
+
+    def _trim_log(self, widget: tk.Text, added: int):
+        # Ring buffer: once over the cap, drop the oldest 10% in one delete
+        key = str(widget)
+        count = self._line_counts.get(key, 0) + added
+        if count > self.max_log_lines:
+            trim = count - self.max_log_lines + self.max_log_lines // 10
+            widget.delete("1.0", f"{trim + 1}.0")
+            count -= trim
+        self._line_counts[key] = count
 
     def _toggle_wrap(self):
         self.log_text.config(wrap="word" if self.wrap_var.get() else "none")
@@ -594,6 +793,10 @@ class BlueBotGUI(ttk.Frame):
     def _clear_logs(self):
         self.log_text.delete("1.0", "end")
         self.preview.delete("1.0", "end")
+        self._line_counts.clear()
+        for pending in self._pending_for.values():
+            pending.clear()
+        self._pending_lines = dict.fromkeys(self._pending_lines, 0)
 
     # ---------- Shortcuts & Status ----------
     def _bind_shortcuts(self):
@@ -618,20 +821,34 @@ class BlueBotGUI(ttk.Frame):
         except Exception:
             pass
 
+        # pulse only while running; no timer at all otherwise
+        if state == "running":
+            if self._pulse_after is None:
+                self._animate_status_pill()
+        else:
+            self._stop_pulse()
+
     def _animate_status_pill(self):
         # soft pulse while running
+        self.pulse_phase = (self.pulse_phase + 1) % len(self._pulse_colors)
         try:
-            if self.status_state == "running":
-                self.pulse_phase = (self.pulse_phase + 1) % 60
-                t = (self.pulse_phase / 60.0)
-                mix = 0.10 + 0.10 * (1 + (2*t - 1))  # simple wave
-                self.status_pill.configure(background=self._blend(
-                    "#1b2231", self.accent, abs(mix)))
-            else:
-                self.status_pill.configure(background="#1b2231")
+            self.status_pill.configure(
+                background=self._pulse_colors[self.pulse_phase])
+        except Exception:
+            pass
+        self._pulse_after = self.master.after(120, self._animate_status_pill)
+
+    def _stop_pulse(self):
+        if self._pulse_after is not None:
+            try:
+                self.master.after_cancel(self._pulse_after)
+            except Exception:
+                pass
+            self._pulse_after = None
+        try:
+            self.status_pill.configure(background="#1b2231")
         except Exception:
             pass
-        self.master.after(120, self._animate_status_pill)
 
     def _apply_accent(self):
         color = self.accent_var.get().strip() or self.accent
@@ -641,8 +858,9 @@ class BlueBotGUI(ttk.Frame):
             return
         self.accent = color
         self.prefs["accent_color"] = color
-        save_prefs(self.prefs)
+        self._schedule_prefs_save()
         self._init_theme()
+        self._reset_gradient_cache()
         self._paint_header_gradient(self.header_canvas)
 
     def _persist(self):
@@ -651,26 +869,42 @@ class BlueBotGUI(ttk.Frame):
         self.prefs["monitor_index"] = self.mon_var.get().strip()
         self.prefs["window_title"] = self.win_var.get().strip()
         self.prefs["wrap_logs"] = bool(self.wrap_var.get())
+        self._schedule_prefs_save()
+
+    def _schedule_prefs_save(self):
+        # debounce: coalesce bursts of edits into one write 500 ms later
+        if self._prefs_after is not None:
+            self.master.after_cancel(self._prefs_after)
+        self._prefs_after = self.master.after(500, self._flush_prefs)
+
+    def _flush_prefs(self):
+        if self._prefs_after is not None:
+            self.master.after_cancel(self._prefs_after)
+            self._prefs_after = None
         save_prefs(self.prefs)
 
     # ---------- Color helpers ----------
     def _hex_to_rgb(self, h: str):
-        h = h.lstrip("#")
+        # "#rgb" / "#rrggbb" -> one int() parse, then bit shifts
+        h = h[1:] if h.startswith("#") else h
         if len(h) == 3:
             h = "".join([c*2 for c in h])
-        return tuple(int(h[i:i+2], 16) for i in (0, 2, 4))
+        v = int(h, 16)
+        return (v >> 16) & 255, (v >> 8) & 255, v & 255
 
     def _rgb_to_hex(self, rgb):
         r, g, b = rgb
-        return f"#{r:02x}{g:02x}{b:02x}"
+        return f"#{(r << 16) | (g << 8) | b:06x}"
 
     def _blend(self, c1: str, c2: str, t: float):
+        # 8.8 fixed-point mix
         r1, g1, b1 = self._hex_to_rgb(c1)
         r2, g2, b2 = self._hex_to_rgb(c2)
-        r = int(r1*(1-t) + r2*t)
-        g = int(g1*(1-t) + g2*t)
-        b = int(b1*(1-t) + b2*t)
-        return self._rgb_to_hex((r, g, b))
+        ti = int(t * 256)
+        si = 256 - ti
+        return self._rgb_to_hex(((r1*si + r2*ti) >> 8,
+                                 (g1*si + g2*ti) >> 8,
+                                 (b1*si + b2*ti) >> 8))
 
     # ---------- Close ----------
     def on_close(self):
@@ -686,7 +920,8 @@ class BlueBotGUI(ttk.Frame):
             except Exception:
                 pass
         self._cleanup_proc()
-        save_prefs(self.prefs)
+        self._stop_pulse()
+        self._flush_prefs()
         try:
             self.master.destroy()
         except Exception:
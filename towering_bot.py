@@ -17,10 +17,10 @@
 
 from __future__ import annotations
 import time
-import random
 import threading
-from dataclasses import dataclass
-from typing import Optional, Tuple, Dict
+import zlib
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Tuple, Dict
 
 import os  # <-- env override support (optional, used by BlueBot GUI)
 import numpy as np
@@ -28,9 +28,10 @@ import cv2 as cv
 import mss
 import pyautogui
 from pynput import keyboard
-# only used for left-click spam (works well with some games)
+# all mouse input: _click_at and the left-click spam (SetCursorPos + SendInput)
 from pywinauto import mouse
 
+
 try:
     import win32gui  # optional (window rect)
 except Exception:
@@ -68,9 +69,35 @@ POST_LEAVE_WINDOW = 8.0
 SPAM_FAILSAFE_SECS = 16 * 60
 FAILSAFE_RETRY_SECS = 2.0
 
+# F-guard: the dungeon HUD is (re)checked at most this often
+HUD_REPROBE_SECS = 1.0
+
 # Retry "Match" if Matching disappears
 MATCH_RETRY_COOLDOWN = 3.0  # seconds
 
+# Matching runs on 2x-downscaled frames; scores this close below the
+# threshold are re-checked at full resolution
+HALF_RES_MARGIN = 0.05  # floor; Vision widens it per template
+
+# Large templates are searched at 1/4 scale first; full resolution is only
+# matched in a small window around the coarse peak
+PYRAMID_KEYS = ("HUD_DUNGEON", "BTN_LEAVE_DUNGEON", "LBL_VICTORY")
+PYRAMID_PAD = 6  # full-res px searched around the upscaled 1/4 peak
+
+# matchTemplate output buffers kept for reuse (LRU); whole-frame maps larger
+# than this are allocated per call instead
+RES_BUF_BYTES = 16 << 20
+
+# Background capture rate; scans read the latest frame instead of grabbing
+CAPTURE_HZ = 30
+
+# How Vision.prepare turns a BGRA capture into the frame templates match on:
+#   "cv"    cv.cvtColor (default; SIMD, fastest on few cores)
+#   "numba" vision_kernels.bgra_to_gray, same luma, scales with cores
+#   "green" green channel only (templates loaded the same way); re-check
+#           THRESH before relying on it
+GRAY_MODE = "cv"
+
 # Template thresholds (tuned)
 THRESH = {
     # World/Lobby
@@ -91,6 +118,22 @@ THRESH = {
     "BTN_CONFIRM_PARTY":  0.90,
 }
 
+# Search windows per key (x, y, w, h as fractions of the monitor).
+# Keys without an entry are scanned full-monitor; widen an ROI if a
+# detection that used to fire stops firing. LBL_MATCHING uses MATCHING_REGIONS.
+REGIONS = {
+    # World/Lobby
+    "F_TOWERING":         (0.45, 0.30, 0.55, 0.60),  # [F] prompt, right of center
+    "BTN_TOWERING_HARD":  (0.45, 0.05, 0.55, 0.90),  # difficulty list, right half
+    "BTN_MATCH":          (0.45, 0.50, 0.55, 0.50),  # lower-right cluster
+    "BTN_DECLINE_CPT":    (0.15, 0.20, 0.70, 0.65),  # centered popup
+    "BTN_CONFIRM_MATCH":  (0.15, 0.20, 0.70, 0.65),  # centered popup
+
+    # Dungeon / flow
+    "LBL_VICTORY":        (0.10, 0.00, 0.80, 0.60),
+    "BTN_LEAVE_DUNGEON":  (0.25, 0.45, 0.75, 0.55),
+}
+
 # File map for templates
 TEMPLATES = {
     # World/Lobby — Towering Ruin
@@ -120,19 +163,12 @@ pyautogui.FAILSAFE = False
 # ------------------------- UTILITIES ---------------------------- #
 
 
-@dataclass
-class Match:
+class Match(NamedTuple):
+    # callers only click the center and log the score, so that's all we keep
     name: str
-    top_left: Tuple[int, int]
-    bottom_right: Tuple[int, int]
+    center: Tuple[int, int]
     score: float
 
-    @property
-    def center(self) -> Tuple[int, int]:
-        x1, y1 = self.top_left
-        x2, y2 = self.bottom_right
-        return (x1 + (x2 - x1)//2, y1 + (y2 - y1)//2)
-
 
 def _win_rect_for_title(sub: str) -> Optional[Tuple[int, int, int, int]]:
     # best-effort window binding by title substring (case-insensitive)
@@ -155,6 +191,13 @@ def _win_rect_for_title(sub: str) -> Optional[Tuple[int, int, int, int]]:
     return out
 
 
+def _offset(m: Optional[Match], dx: int, dy: int) -> Optional[Match]:
+    # shift a match from image coords to screen coords
+    if m is None:
+        return None
+    return Match(m.name, (m.center[0] + dx, m.center[1] + dy), m.score)
+
+
 def _monitor_bbox(sct: mss.mss, rect: Optional[Tuple[int, int, int, int]]):
     # turn monitor index or window rect into an mss bbox
     if rect is None:
@@ -170,30 +213,143 @@ class Vision:
     def __init__(self, templates: Dict[str, str]):
         # load templates in grayscale, keep dims for quick guards
         self.tmps = {}
+        self.tmps_half = {}  # pre-downscaled copies for the coarse pass
+        self.tmps_quarter = {}  # PYRAMID_KEYS only
+        self.half_margin = {}  # per-template HALF_RES_MARGIN, see below
+        self.quarter_margin = {}
+        self._res_buf = OrderedDict()  # (H, W, key, level) -> output, LRU
+        self._res_buf_bytes = 0
         for k, p in templates.items():
-            img = cv.imread(p, cv.IMREAD_GRAYSCALE)
+            if GRAY_MODE == "green":
+                img = cv.imread(p, cv.IMREAD_COLOR)
+                img = None if img is None else np.ascontiguousarray(img[:, :, 1])
+            else:
+                img = cv.imread(p, cv.IMREAD_GRAYSCALE)
             if img is None:
                 raise FileNotFoundError(f"Template not found: {p}")
             self.tmps[k] = (img, img.shape[::-1])
+            half = cv.resize(img, (img.shape[1]//2, img.shape[0]//2),
+                             interpolation=cv.INTER_AREA)
+            self.tmps_half[k] = (half, half.shape[::-1])
+            self.half_margin[k] = self._coarse_margin(k, 2)
+            if k in PYRAMID_KEYS:
+                quarter = cv.resize(half, (half.shape[1]//2, half.shape[0]//2),
+                                    interpolation=cv.INTER_AREA)
+                self.tmps_quarter[k] = (quarter, quarter.shape[::-1])
+                self.quarter_margin[k] = self._coarse_margin(k, 4)
+
+        # GRAY_MODE "numba": load (and compile) the optional kernel only then
+        self._bgra_to_gray = None
+        if GRAY_MODE == "numba":
+            import vision_kernels
+            if vision_kernels.NUMBA_OK:
+                vision_kernels.warmup()
+                self._bgra_to_gray = vision_kernels.bgra_to_gray
+
+    def _coarse_margin(self, key, factor: int) -> float:
+        # A target off the 2x2 (4x4) grid gets averaged with its surroundings
+        # by the downscale, which costs thin text/outlines a lot of score.
+        # Measure that loss on the template itself so the coarse pass never
+        # rejects a real hit.
+        img = self.tmps[key][0]
+        tmpl = (self.tmps_half if factor == 2 else self.tmps_quarter)[key][0]
+        worst = 1.0
+        for bg in (0, 255):  # darkest / brightest surroundings
+            pad = cv.copyMakeBorder(img, factor, factor, factor, factor,
+                                    cv.BORDER_CONSTANT, value=bg)
+            for dy in range(factor):
+                for dx in range(factor):
+                    small = pad[dy:, dx:]
+                    for _ in range(factor // 2):  # same 2x steps as the frame
+                        small = cv.resize(small, (small.shape[1]//2, small.shape[0]//2),
+                                          interpolation=cv.INTER_AREA)
+                    _, maxV, _, _ = cv.minMaxLoc(
+                        cv.matchTemplate(small, tmpl, cv.TM_CCOEFF_NORMED))
+                    worst = min(worst, maxV)
+        return max(HALF_RES_MARGIN, 1.0 - worst + 0.02)
+
+    def prepare(self, frame_bgra: np.ndarray) -> np.ndarray:
+        # the one place a capture becomes the single-channel image every
+        # matcher takes (GRAY_MODE picks how)
+        if GRAY_MODE == "green":
+            return np.ascontiguousarray(frame_bgra[:, :, 1])
+        if self._bgra_to_gray is not None:
+            out = np.empty(frame_bgra.shape[:2], dtype=np.uint8)
+            self._bgra_to_gray(frame_bgra, out)
+            return out
+        return cv.cvtColor(frame_bgra, cv.COLOR_BGRA2GRAY)
+
+    def find_best_gray(self, gray, key, thr: float, half=None):
+        # coarse pass on the half-res frame; a coarse hit is only a candidate
+        # (downscaling raises scores), confirmed at full res around its peak
+        w, h = self.tmps[key][1]
+        if half is not None and key in self.tmps_quarter:
+            quarter = cv.resize(half, (half.shape[1]//2, half.shape[0]//2),
+                                interpolation=cv.INTER_AREA)
+            hit = self._match(quarter, key, level=2)
+            if hit is not None:
+                maxV, (x, y) = hit
+                if maxV < thr - self.quarter_margin[key]:
+                    return None
+                return self._refine(gray, key, thr, 4*x, 4*y)
+        if half is not None:
+            hit = self._match(half, key, level=1)
+            if hit is not None:
+                maxV, (x, y) = hit
+                if maxV >= thr:
+                    return self._refine(gray, key, thr, 2*x, 2*y)
+                if maxV < thr - self.half_margin[key]:
+                    return None
+        hit = self._match(gray, key)
+        if hit is not None and hit[0] >= thr:
+            maxV, (x, y) = hit
+            return Match(key, (x + w//2, y + h//2), maxV)
+        return None
 
-    def find_best(self, frame_bgr, key, thr: float):
+    def _result_buf(self, H, W, key, level, tmpl):
+        # reuse the response map: ROIs repeat every tick, so no malloc.
+        # Bounded by RES_BUF_BYTES so probes / whole-frame scans can't pile up.
+        bk = (H, W, key, level)
+        buf = self._res_buf.get(bk)
+        if buf is not None:
+            self._res_buf.move_to_end(bk)
+            return buf
+        buf = np.empty((H - tmpl.shape[0] + 1, W - tmpl.shape[1] + 1),
+                       dtype=np.float32)
+        if buf.nbytes <= RES_BUF_BYTES:
+            self._res_buf[bk] = buf
+            self._res_buf_bytes += buf.nbytes
+            while self._res_buf_bytes > RES_BUF_BYTES:
+                self._res_buf_bytes -= self._res_buf.popitem(last=False)[1].nbytes
+        return buf
+
+    def _refine(self, gray, key, thr: float, x: int, y: int):
+        # full-res match in a PYRAMID_PAD window around a coarse candidate
+        w, h = self.tmps[key][1]
+        x0, y0 = max(0, x - PYRAMID_PAD), max(0, y - PYRAMID_PAD)
+        win = gray[y0:y + h + PYRAMID_PAD, x0:x + w + PYRAMID_PAD]
+        hit = self._match(win, key)
+        if hit is not None and hit[0] >= thr:
+            maxV, (dx, dy) = hit
+            return Match(key, (x0 + dx + w//2, y0 + dy + h//2), maxV)
+        return None
+
+    def _match(self, gray, key, level: int = 0):
         # single best match via TM_CCOEFF_NORMED, guard too-small regions
-        gray = cv.cvtColor(frame_bgr, cv.COLOR_BGR2GRAY)
-        tmpl, (w, h) = self.tmps[key]
+        # level: 0 full res, 1 half, 2 quarter (PYRAMID_KEYS)
+        tmpl, _ = (self.tmps, self.tmps_half, self.tmps_quarter)[level][key]
         H, W = gray.shape[:2]
         if H < tmpl.shape[0] or W < tmpl.shape[1]:
             if DEBUG:
                 print(
                     f"[Skip] {key}: {W}xH {W}x{H} < tmpl {tmpl.shape[1]}x{tmpl.shape[0]}")
             return None
-        res = cv.matchTemplate(gray, tmpl, cv.TM_CCOEFF_NORMED)
+        res = cv.matchTemplate(gray, tmpl, cv.TM_CCOEFF_NORMED,
+                               result=self._result_buf(H, W, key, level, tmpl))
         _, maxV, _, maxL = cv.minMaxLoc(res)
         if DEBUG:
             print(f"[Score] {key}: {maxV:.3f}")
-        if maxV >= thr:
-            x, y = maxL
-            return Match(key, (x, y), (x+w, y+h), maxV)
-        return None
+        return maxV, maxL
 
 # ----------------------------- BOT ------------------------------- #
 
@@ -202,6 +358,7 @@ class Bot:
     def __init__(self):
         self.running = False
         self.exit_flag = False
+        self._wake = threading.Event()  # set by hotkeys to end an _idle early
         self.vision = Vision(TEMPLATES)
         self.window_rect = _win_rect_for_title(
             GAME_WINDOW_TITLE) if GAME_WINDOW_TITLE else None
@@ -226,6 +383,11 @@ class Bot:
         self.hud_timer_armed = False
         self.failsafe_last_try_ts = 0.0
 
+        # cached "inside a dungeon" flag for the F-guard: refreshed every
+        # HUD_REPROBE_SECS, also set/cleared on HUD arm, leave and _full_reset
+        self._in_dungeon = False
+        self._hud_probe_ts = 0.0
+
         # leave-party timing
         self.leave_enter_ts = 0.0  # when we entered LEAVE_PARTY, after esc+i
 
@@ -236,70 +398,219 @@ class Bot:
         self.leave_probe_start_ts = 0.0
         self.leave_probe_done = False
 
+        # one grab + one grayscale conversion per tick, shared by every scan
+        self._frame_cache = {"gray": None, "half": None, "box": None}
+
+        # latest (ts, gray, half, box) published by _capture_worker
+        self._frame_cond = threading.Condition()
+        self._latest = None
+        self._frame_not_before = 0.0  # set by inputs/resume: older frames are stale
+
+        # (key, region, thr) -> (crc32 of the searched pixels, result)
+        self._scan_memo: Dict[tuple, tuple] = {}
+
+        # random click jitter / spam periods, drawn 4096 at a time
+        self._jitter_xy = []
+        self._spam_periods = []
+
+        # mss bbox, rebuilt only when window_rect changes
+        self._full_box = None
+        self._full_box_rect = None
+
+    # ---- run control (called from the hotkey thread) ----
+    def set_running(self, on: bool):
+        if on:
+            # frames the worker grabbed before a pause may be minutes old
+            self._frame_not_before = time.monotonic()
+        self.running = on
+        self._wake.set()
+
+    def stop(self):
+        self.exit_flag = True
+        self._wake.set()
+
+    def _idle(self, secs: float):
+        # wait between ticks; pause/resume/exit end it at once so they don't
+        # lag by a whole poll. Any other wake (F8 while already running) keeps
+        # waiting: post-input settle time must not be cut short.
+        was = (self.running, self.exit_flag)
+        deadline = time.monotonic() + secs
+        while True:
+            left = deadline - time.monotonic()
+            if left <= 0:
+                return
+            if self._wake.wait(left):
+                self._wake.clear()
+                if (self.running, self.exit_flag) != was:
+                    return
+
     # ---- input helpers ----
+    # every input changes the screen -> drop the cached frame
     def _press_f(self):
         pyautogui.keyDown('f')
         time.sleep(CLICK_DELAY)
         pyautogui.keyUp('f')
+        self._invalidate_frame()
 
     def _press_h_once(self):
         pyautogui.keyDown('h')
         time.sleep(2)
         pyautogui.keyUp('h')
+        self._invalidate_frame()
+
+    def _press_key(self, key: str):
+        pyautogui.press(key)
+        self._invalidate_frame()
 
     def _click_at(self, pt):
-        x = pt[0] + random.randint(-RANDOM_MOVE_JITTER_PX,
-                                   RANDOM_MOVE_JITTER_PX)
-        y = pt[1] + random.randint(-RANDOM_MOVE_JITTER_PX,
-                                   RANDOM_MOVE_JITTER_PX)
-        pyautogui.moveTo(x, y, duration=random.uniform(0.02, 0.06))
-        pyautogui.click()
+        if not self._jitter_xy:
+            self._jitter_xy = np.random.randint(
+                -RANDOM_MOVE_JITTER_PX, RANDOM_MOVE_JITTER_PX + 1,
+                size=(4096, 2)).tolist()
+        dx, dy = self._jitter_xy.pop()
+        # SetCursorPos + SendInput, no eased move: returns in microseconds
+        mouse.click(button='left', coords=(int(pt[0] + dx), int(pt[1] + dy)))
+        self._invalidate_frame()
+
+    def _spam_period(self) -> float:
+        # seconds until the next spam click (CPS_MIN..CPS_MAX clicks/sec)
+        if not self._spam_periods:
+            self._spam_periods = (
+                1.0 / np.random.uniform(CPS_MIN, CPS_MAX, size=4096)).tolist()
+        return self._spam_periods.pop()
 
     # ---- capture & detect ----
     def _grab(self, sct: mss.mss, box=None):
         if box is None:
-            box = _monitor_bbox(sct, self.window_rect)
-        return np.array(sct.grab(box))[:, :, :3].copy()
-
-    def _scan_full(self, sct: mss.mss, key: str, thr: float):
-        box = _monitor_bbox(sct, self.window_rect)
-        frame = self._grab(sct, box)
-        m = self.vision.find_best(frame, key, thr)
-        if m is None:
-            return None
-        return Match(
-            m.name,
-            (m.top_left[0] + box['left'],  m.top_left[1] + box['top']),
-            (m.bottom_right[0] + box['left'], m.bottom_right[1] + box['top']),
-            m.score
-        )
+            box = self._box(sct)
+        # zero-copy BGRA view over mss's raw buffer
+        shot = sct.grab(box)
+        return np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+
+    def _box(self, sct: mss.mss):
+        if self._full_box is None or self._full_box_rect != self.window_rect:
+            self._full_box = _monitor_bbox(sct, self.window_rect)
+            self._full_box_rect = self.window_rect
+            self._scan_memo.clear()
+        return self._full_box
+
+    def _next_tick(self):
+        # drop the cached frame; the next scan takes the worker's latest
+        self._frame_cache["gray"] = None
+
+    def _invalidate_frame(self):
+        # after an input: only frames grabbed from now on are valid
+        self._frame_cache["gray"] = None
+        self._frame_not_before = time.monotonic()
+
+    def _capture(self, sct: mss.mss):
+        ts = time.monotonic()
+        box = self._box(sct)
+        gray = self.vision.prepare(self._grab(sct, box))
+        H, W = gray.shape
+        half = cv.resize(gray, (W//2, H//2), interpolation=cv.INTER_AREA)
+        return ts, gray, half, box
+
+    def _capture_worker(self):
+        # own mss handle, opened once and kept across pause/resume; capture
+        # handles must stay on the thread that made them.
+        # Every frame is a fresh array, so readers never see a half-written one.
+        period = 1.0 / CAPTURE_HZ
+        with mss.mss() as sct:
+            while not self.exit_flag:
+                if not self.running:
+                    time.sleep(0.05)
+                    continue
+                frame = self._capture(sct)
+                with self._frame_cond:
+                    self._latest = frame
+                    self._frame_cond.notify_all()
+                left = period - (time.monotonic() - frame[0])
+                if left > 0:
+                    time.sleep(left)
+
+    def _tick_frame(self, sct: mss.mss):
+        # full-monitor grayscale from the capture worker, reused until invalidated
+        fc = self._frame_cache
+        if fc["gray"] is None:
+            with self._frame_cond:
+                fresh = self._frame_cond.wait_for(
+                    lambda: self._latest is not None
+                    and self._latest[0] >= self._frame_not_before,
+                    timeout=0.5)
+                frame = self._latest
+            if not fresh:
+                frame = self._capture(sct)  # worker stalled: grab inline
+            _, fc["gray"], fc["half"], fc["box"] = frame
+        return fc["gray"], fc["half"], fc["box"]
+
+    def _scan_full(self, sct: mss.mss, key: str, thr: float, use_roi: bool = True):
+        # keys with a REGIONS entry only search their window
+        region = REGIONS.get(key) if use_roi else None
+        if region is not None:
+            return self._scan_region(sct, key, region, thr)
+        gray, half, box = self._tick_frame(sct)
+        m = self._find_memo(key, None, thr, gray, half)
+        return _offset(m, box["left"], box["top"])
 
     def _scan_region(self, sct: mss.mss, key: str, region_percent, thr: float):
-        full = _monitor_bbox(sct, self.window_rect)
-        L, T, W, H = full["left"], full["top"], full["width"], full["height"]
+        gray, half, full = self._tick_frame(sct)
+        H, W = gray.shape
         rx, ry, rw, rh = region_percent
-        box = dict(left=int(L + rx*W), top=int(T + ry*H),
-                   width=int(rw*W), height=int(rh*H))
-        frame = self._grab(sct, box)
-        m = self.vision.find_best(frame, key, thr)
-        if m is None:
-            return None
-        return Match(
-            m.name,
-            (m.top_left[0] + box['left'],  m.top_left[1] + box['top']),
-            (m.bottom_right[0] + box['left'], m.bottom_right[1] + box['top']),
-            m.score
-        )
+        # even origin so the half-res slice lines up with the full-res one
+        x, y = int(rx*W) & ~1, int(ry*H) & ~1
+        x2, y2 = x + int(rw*W), y + int(rh*H)
+        crop = gray[y:y2, x:x2]
+        crop_half = half[y//2:y2//2, x//2:x2//2]
+        m = self._find_memo(key, region_percent, thr, crop, crop_half)
+        return _offset(m, full["left"] + x, full["top"] + y)
+
+    def _find_memo(self, key, region, thr, crop, crop_half):
+        # same pixels as last time -> same answer, skip matchTemplate
+        crc = zlib.crc32(np.ascontiguousarray(crop))
+        memo = self._scan_memo.get((key, region, thr))
+        if memo is not None and memo[0] == crc:
+            return memo[1]
+        m = self.vision.find_best_gray(crop, key, thr, half=crop_half)
+        self._scan_memo[(key, region, thr)] = (crc, m)
+        return m
+
+    def _scan_set(self, sct: mss.mss, specs) -> Dict[str, Optional[Match]]:
+        # specs: [(key, region_or_None, thr)], all answered from one frame;
+        # a key listed with several regions reports its first hit
+        self._tick_frame(sct)
+        out: Dict[str, Optional[Match]] = {}
+        for key, region, thr in specs:
+            if out.get(key) is not None:
+                continue
+            if region is None:
+                out[key] = self._scan_full(sct, key, thr)
+            else:
+                out[key] = self._scan_region(sct, key, region, thr)
+        return out
 
     def _maybe_arm_hud_timer(self, sct):
         if not self.hud_timer_armed:
             hud = self._scan_full(sct, "HUD_DUNGEON", THRESH["HUD_DUNGEON"])
             if hud:
+                self._in_dungeon = True
                 self.dungeon_timer_start = time.time()
                 self.hud_timer_armed = True
                 print("[Bot] HUD detected -> arm 16min timer + press H once")
                 self._press_h_once()
 
+    def _hud_seen(self, sct) -> bool:
+        # HUD presence only changes on entering/leaving a dungeon, so the
+        # whole-monitor probe runs at most every HUD_REPROBE_SECS. It runs in
+        # both directions: a run can also end by kick, disconnect or manual
+        # leave, and the F-guard must come back then.
+        now = time.monotonic()
+        if now - self._hud_probe_ts >= HUD_REPROBE_SECS:
+            self._hud_probe_ts = now
+            self._in_dungeon = self._scan_full(
+                sct, "HUD_DUNGEON", THRESH["HUD_DUNGEON"]) is not None
+        return self._in_dungeon
+
     def _full_reset(self):
         self.hard_clicked = False
         self.match_clicked = False
@@ -312,6 +623,8 @@ class Bot:
         self.dungeon_timer_start = 0.0
         self.hud_timer_armed = False
         self.failsafe_last_try_ts = 0.0
+        self._in_dungeon = False
+        self._hud_probe_ts = 0.0
         self.leave_enter_ts = 0.0
         self.last_match_retry_ts = 0.0
         # reset one-time probe
@@ -329,7 +642,7 @@ class Bot:
             "BTN_LEAVE_ICON", "BTN_CONFIRM_PARTY",
         ]
         for k in probe_order:
-            m = self._scan_full(sct, k, THRESH.get(k, 0.8))
+            m = self._scan_full(sct, k, THRESH.get(k, 0.8), use_roi=False)
             if m:
                 print(f"[Probe] Found asset: {k} (score={m.score:.3f})")
                 return True
@@ -338,27 +651,32 @@ class Bot:
 
     # --------------------- main loop ---------------------- #
     def loop(self):
+        threading.Thread(target=self._capture_worker, daemon=True).start()
+        # one handle for the bot's lifetime (inline fallback grabs + _box).
+        # Not shared with the worker and not created in __init__: mss keeps
+        # its GDI device contexts per thread, so each thread opens its own.
         with mss.mss() as sct:
-            full = _monitor_bbox(sct, self.window_rect)
+            full = self._box(sct)
             print(
                 f"[Bot] Started. State=WAIT_F | monitor={MONITOR_INDEX} box={full}")
             while not self.exit_flag:
                 if not self.running:
-                    time.sleep(0.05)
+                    self._idle(0.5)  # F8/F10 wake it immediately
                     continue
 
+                # fresh frame for this tick
+                self._next_tick()
+
                 # >>> F-GUARD (collision-free)
                 # Active ONLY when not in LEAVE_PARTY and HUD isn't visible.
-                in_dungeon = self._scan_full(
-                    sct, "HUD_DUNGEON", THRESH["HUD_DUNGEON"])
-                if (self.state != "LEAVE_PARTY") and (not in_dungeon):
+                if (self.state != "LEAVE_PARTY") and (not self._hud_seen(sct)):
                     fg = self._scan_full(
                         sct, "F_TOWERING", THRESH["F_TOWERING"])
                     if fg and self.state != "WAIT_F":
                         print(
                             "[Bot] F-Guard: F_TOWERING visible -> reset to WAIT_F")
                         self._full_reset()
-                        time.sleep(0.15)
+                        self._idle(0.15)
                         continue
 
                 # 1) Wait for [F] prompt
@@ -368,7 +686,7 @@ class Bot:
                     if f:
                         print("[Bot] F_TOWERING prompt -> press F")
                         self._press_f()
-                        time.sleep(1)
+                        self._idle(1)
                         self.state = "WAIT_HARD"
                         continue
 
@@ -381,7 +699,7 @@ class Bot:
                             print("[Bot] HARD (Towering) -> click once")
                             self._click_at(h.center)
                             self.hard_clicked = True
-                            time.sleep(1)
+                            self._idle(1)
                     self.state = "WAIT_MATCH"
                     continue
 
@@ -394,11 +712,11 @@ class Bot:
                             print("[Bot] MATCH -> click once")
                             self._click_at(m.center)
                             self.match_clicked = True
-                            time.sleep(1)
+                            self._idle(1)
                             self.captain_wait_start = time.time()
                             self.state = "BECOME_CAPTAIN"
                             continue
-                    time.sleep(0.05)
+                    self._idle(0.05)
                     continue
 
                 # 4) Captain dialog
@@ -408,7 +726,7 @@ class Bot:
                     if d:
                         print("[Bot] Captain prompt: Decline -> click")
                         self._click_at(d.center)
-                        time.sleep(0.6)
+                        self._idle(0.6)
                         self.match_check_start = time.time()
                         self.state = "CHECK_MATCHING_UNTIL_CONFIRM"
                         continue
@@ -416,48 +734,41 @@ class Bot:
                     if (time.time() - self.captain_wait_start) >= CAPTAIN_DECLINE_GRACE:
                         print(
                             "[Bot] Decline not found -> ESC, then I -> LEAVE_PARTY")
-                        pyautogui.press('esc')
+                        self._press_key('esc')
                         time.sleep(0.2)
-                        pyautogui.press('i')
+                        self._press_key('i')
                         self.leave_enter_ts = time.time()
                         self.state = "LEAVE_PARTY"
                         continue
 
-                    time.sleep(0.1)
+                    self._idle(0.1)
                     continue
 
                 # 5) Matching/Confirm loop
                 elif self.state == "CHECK_MATCHING_UNTIL_CONFIRM":
                     now = time.time()
+                    hits = self._scan_set(sct, [
+                        # both strips from one frame; first hit wins
+                        *[("LBL_MATCHING", rp, THRESH["LBL_MATCHING"])
+                          for rp in MATCHING_REGIONS],
+                        ("BTN_CONFIRM_MATCH", None, THRESH["BTN_CONFIRM_MATCH"]),
+                    ])
+                    matching = hits["LBL_MATCHING"] is not None
 
                     if not self.matching_seen:
-                        found = False
-                        for rp in MATCHING_REGIONS:
-                            mlabel = self._scan_region(
-                                sct, "LBL_MATCHING", rp, THRESH["LBL_MATCHING"])
-                            if mlabel:
-                                found = True
-                                break
-                        if found:
+                        if matching:
                             print("[Bot] Matching... seen (latched)")
                             self.matching_seen = True
 
                     if (now - self.last_match_retry_ts) >= MATCH_RETRY_COOLDOWN:
-                        still_matching = False
-                        for rp in MATCHING_REGIONS:
-                            mlabel = self._scan_region(
-                                sct, "LBL_MATCHING", rp, THRESH["LBL_MATCHING"])
-                            if mlabel:
-                                still_matching = True
-                                break
-                        if not still_matching:
+                        if not matching:
                             print(
                                 "[Bot] Matching not visible -> click MATCH again")
                             mbtn = self._scan_full(
                                 sct, "BTN_MATCH", THRESH["BTN_MATCH"])
                             if mbtn:
                                 self._click_at(mbtn.center)
-                                time.sleep(0.6)
+                                self._idle(0.6)
                                 self.captain_wait_start = time.time()
                                 self.last_match_retry_ts = now
                                 self.state = "BECOME_CAPTAIN"
@@ -465,12 +776,11 @@ class Bot:
                             else:
                                 self.last_match_retry_ts = now
 
-                    cfm = self._scan_full(
-                        sct, "BTN_CONFIRM_MATCH", THRESH["BTN_CONFIRM_MATCH"])
+                    cfm = hits["BTN_CONFIRM_MATCH"]
                     if cfm:
                         print("[Bot] Match popup -> initial CONFIRM")
                         self._click_at(cfm.center)
-                        time.sleep(0.8)
+                        self._idle(0.8)
                         self.confirm_monitor_start = time.time()
                         self.last_confirm_seen = time.time()
                         self.state = "CONFIRM_MONITOR"
@@ -479,14 +789,14 @@ class Bot:
                     if (not self.matching_seen) and ((now - self.match_check_start) > 5.0):
                         print(
                             "[Bot] No Matching/Confirm -> ESC, then I -> LEAVE_PARTY")
-                        pyautogui.press('esc')
+                        self._press_key('esc')
                         time.sleep(0.2)
-                        pyautogui.press('i')
+                        self._press_key('i')
                         self.leave_enter_ts = time.time()
                         self.state = "LEAVE_PARTY"
                         continue
 
-                    time.sleep(0.1)
+                    self._idle(0.1)
                     continue
 
                 # 6) Confirm monitor
@@ -494,16 +804,18 @@ class Bot:
                     self._maybe_arm_hud_timer(sct)
 
                     now = time.time()
-                    cfm = self._scan_full(
-                        sct, "BTN_CONFIRM_MATCH", THRESH["BTN_CONFIRM_MATCH"])
+                    hits = self._scan_set(sct, [
+                        ("BTN_CONFIRM_MATCH", None, THRESH["BTN_CONFIRM_MATCH"]),
+                        ("LBL_VICTORY", None, THRESH["LBL_VICTORY"]),
+                    ])
+                    cfm = hits["BTN_CONFIRM_MATCH"]
                     if cfm:
                         self.last_confirm_seen = now
                         print("[Bot] CONFIRM_MONITOR: CONFIRM seen -> click")
                         self._click_at(cfm.center)
                         time.sleep(0.3)
 
-                    vic = self._scan_full(
-                        sct, "LBL_VICTORY", THRESH["LBL_VICTORY"])
+                    vic = hits["LBL_VICTORY"]
                     if vic:
                         print(
                             "[Bot] Victory during confirm-monitor -> WAIT_VICTORY_LEAVE")
@@ -518,7 +830,7 @@ class Bot:
                             continue
                         else:
                             self.confirm_monitor_start = now
-                    time.sleep(0.12)
+                    self._idle(0.12)
                     continue
 
                 # 7) Spam
@@ -531,7 +843,7 @@ class Bot:
                             if (now - self.failsafe_last_try_ts) >= FAILSAFE_RETRY_SECS:
                                 print(
                                     "[Bot] HUD failsafe reached -> press P and try Confirm")
-                                pyautogui.press('p')
+                                self._press_key('p')
                                 time.sleep(0.3)
                                 cf = self._scan_full(
                                     sct, "BTN_CONFIRM_PARTY", THRESH["BTN_CONFIRM_PARTY"])
@@ -539,7 +851,7 @@ class Bot:
                                     print(
                                         "[Bot] Failsafe confirm -> click, go POST_LEAVE_CHECK")
                                     self._click_at(cf.center)
-                                    time.sleep(0.6)
+                                    self._idle(0.6)
                                     self.post_leave_start = time.time()
                                     self.after_leave_cycle = True
                                     self._full_reset()
@@ -548,29 +860,30 @@ class Bot:
                                     continue
                                 self.failsafe_last_try_ts = now
 
-                    cfm = self._scan_full(
-                        sct, "BTN_CONFIRM_MATCH", THRESH["BTN_CONFIRM_MATCH"])
+                    hits = self._scan_set(sct, [
+                        ("BTN_CONFIRM_MATCH", None, THRESH["BTN_CONFIRM_MATCH"]),
+                        ("LBL_VICTORY", None, THRESH["LBL_VICTORY"]),
+                    ])
+                    cfm = hits["BTN_CONFIRM_MATCH"]
                     if cfm:
                         print(
                             "[Bot] LINKCLICK_SPAM: Confirm reappeared -> click & back to CONFIRM_MONITOR")
                         self._click_at(cfm.center)
-                        time.sleep(0.3)
+                        self._idle(0.3)
                         self.confirm_monitor_start = time.time()
                         self.last_confirm_seen = time.time()
                         self.matching_seen = True
                         self.state = "CONFIRM_MONITOR"
                         continue
 
-                    vic = self._scan_full(
-                        sct, "LBL_VICTORY", THRESH["LBL_VICTORY"])
+                    vic = hits["LBL_VICTORY"]
                     if vic:
                         print("[Bot] Victory detected during spam")
                         self.state = "WAIT_VICTORY_LEAVE"
                         continue
 
-                    cps = random.uniform(CPS_MIN, CPS_MAX)
                     mouse.click(button='left')
-                    time.sleep(1.0 / cps)
+                    self._idle(self._spam_period())
                     continue
 
                 # 8) Victory -> Leave
@@ -580,32 +893,35 @@ class Bot:
                     if lv:
                         print("[Bot] Leave Dungeon -> click")
                         self._click_at(lv.center)
-                        time.sleep(1.0)
+                        self._idle(1.0)
+                        self._in_dungeon = False
                         self.post_leave_start = time.time()
                         self.after_leave_cycle = True
                         self.state = "POST_LEAVE_CHECK"
                         continue
-                    time.sleep(0.2)
+                    self._idle(0.2)
                     continue
 
                 # 9) Post-leave sanity
                 elif self.state == "POST_LEAVE_CHECK":
                     now = time.time()
-                    cfm = self._scan_full(
-                        sct, "BTN_CONFIRM_MATCH", THRESH["BTN_CONFIRM_MATCH"])
+                    hits = self._scan_set(sct, [
+                        ("BTN_CONFIRM_MATCH", None, THRESH["BTN_CONFIRM_MATCH"]),
+                        ("F_TOWERING", None, THRESH["F_TOWERING"]),
+                    ])
+                    cfm = hits["BTN_CONFIRM_MATCH"]
                     if cfm:
                         print(
                             "[Bot] Post-Leave: CONFIRM found -> click & CONFIRM_MONITOR")
                         self._click_at(cfm.center)
-                        time.sleep(0.6)
+                        self._idle(0.6)
                         self.confirm_monitor_start = time.time()
                         self.last_confirm_seen = time.time()
                         self.matching_seen = True
                         self.state = "CONFIRM_MONITOR"
                         continue
 
-                    f = self._scan_full(sct, "F_TOWERING",
-                                        THRESH["F_TOWERING"])
+                    f = hits["F_TOWERING"]
                     if f:
                         print(
                             "[Bot] Post-Leave: F_TOWERING detected -> back to WAIT_F")
@@ -617,14 +933,15 @@ class Bot:
                         self._full_reset()
                         continue
 
-                    time.sleep(0.12)
+                    self._idle(0.12)
                     continue
 
                 # 10) Leave-Party flow
                 elif self.state == "LEAVE_PARTY":
                     # small render grace after ESC+I
-                    if self.leave_enter_ts and (time.time() - self.leave_enter_ts) < 0.6:
-                        time.sleep(0.1)
+                    grace = 0.6 - (time.time() - self.leave_enter_ts)
+                    if self.leave_enter_ts and grace > 0:
+                        self._idle(grace)  # wake right at the deadline
                         continue
 
                     now = time.time()
@@ -645,8 +962,8 @@ class Bot:
                             time.sleep(0.8)
 
                         # close panel and reset loop
-                        pyautogui.press('esc')
-                        time.sleep(0.4)
+                        self._press_key('esc')
+                        self._idle(0.4)
                         self._full_reset()
                         continue
 
@@ -654,7 +971,7 @@ class Bot:
                     if (now - self.leave_enter_ts) >= 5.0:
                         print(
                             "[Bot] Leave-Icon not found for 5s -> press ESC and check F_TOWERING")
-                        pyautogui.press('esc')
+                        self._press_key('esc')
                         time.sleep(0.2)
 
                         f = self._scan_full(
@@ -675,11 +992,11 @@ class Bot:
                             self.leave_probe_done = True
 
                     # 3) still within the 5s window: wait & rescan
-                    time.sleep(0.15)
+                    self._idle(0.15)
                     continue
 
                 # idle throttle
-                time.sleep(0.05)
+                self._idle(0.05)
 
 # ============================== DRIVER ============================== #
 
@@ -693,13 +1010,13 @@ def _run():
     def on_press(key):
         try:
             if key == keyboard.Key.f8:
-                bot.running = True
+                bot.set_running(True)
                 print("[Bot] RUNNING")
             elif key == keyboard.Key.f9:
-                bot.running = False
+                bot.set_running(False)
                 print("[Bot] PAUSED")
             elif key == keyboard.Key.f10:
-                bot.exit_flag = True
+                bot.stop()
                 print("[Bot] EXIT")
                 return False
         except Exception as e:
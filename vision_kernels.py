@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+# vision_kernels.py — optional Numba kernels shared by the BlueBot bots
+#
+# Numba is NOT required. The bots only import this module with
+# GRAY_MODE = "numba"; without Numba NUMBA_OK is False and they keep
+# using cv.cvtColor.
+#
+#   pip install numba   # optional multi-core BGRA -> gray conversion
+
+import os
+
+import numpy as np
+
+# compiled kernels are cached next to the scripts and reused across runs;
+# must be set before numba is imported
+os.environ.setdefault("NUMBA_CACHE_DIR", os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".numba_cache"))
+
+try:
+    from numba import njit, prange  # optional (JIT kernels)
+    NUMBA_OK = True
+except Exception:
+    njit = prange = None
+    NUMBA_OK = False
+
+# Explicit signatures compile at import (or load from the cache) instead of
+# on the first call, which would otherwise stall the first state transition
+# for several seconds. Layout "A" so strided views are accepted too.
+GRAY_SIG = "void(uint8[:, :, :], uint8[:, :])"
+
+if NUMBA_OK:
+    @njit(GRAY_SIG, cache=True, parallel=True, fastmath=True)
+    def bgra_to_gray(bgra, out):
+        # mss BGRA -> 8-bit luma in one pass, written into `out` (H x W uint8).
+        # BT.601 weights in 8-bit fixed point (29+150+77 == 256), rounded;
+        # within 1 LSB of cv.COLOR_BGRA2GRAY, so template scores don't move.
+        H, W = out.shape
+        for y in prange(H):
+            for x in range(W):
+                out[y, x] = (29 * np.uint32(bgra[y, x, 0])
+                             + 150 * np.uint32(bgra[y, x, 1])
+                             + 77 * np.uint32(bgra[y, x, 2]) + 128) >> 8
+else:
+    bgra_to_gray = None
+
+
+def warmup():
+    # run the kernel once on a tiny input so the threading layer and the
+    # machine code are ready before the bot loop starts polling
+    if not NUMBA_OK:
+        return
+    gray = np.zeros((8, 8), dtype=np.uint8)
+    bgra_to_gray(np.zeros((8, 8, 4), dtype=np.uint8), gray)